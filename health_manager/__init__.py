@@ -21,6 +21,7 @@ from .remote_node_utils import (
     copy_script_to_node,
     distribute_scripts_parallel,
     fetch_remote_json,
+    fetch_remote_jsons_parallel,
     get_remote_context,
     handle_reboot_and_recheck
 )
@@ -29,7 +30,8 @@ from .ghr_payload_utils import (
     build_ghr_payload,
     submit_ghr_request,
     record_ghr_log,
-    get_current_timestamps
+    get_current_timestamps,
+    iter_ndjson
 )
 from .health_manager_config import (
     TIMESTAMP,
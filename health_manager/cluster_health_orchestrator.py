@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 import os
 import time
+import asyncio
+import shlex
+import shutil
 import subprocess
 import logging
 import json
-import importlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import remote_node_utils
+from remote_node_utils import SSH_MUX_OPTIONS, SSH_MASTER_OPTIONS
 from report_generator import summarize_and_output
 from health_manager_config import (
     USER_HOME,
@@ -23,72 +24,122 @@ from health_manager_config import (
 # =============================
 def get_nodes() -> list[str]:
     """
-    Reload the contents of config.py each time and return a hostname list from the latest PREFIX and NODE_COUNT
+    Return a hostname list from the current NODE_PREFIX and NODE_COUNT environment variables
+    (same defaults as PREFIX / NODE_COUNT in health_manager_config)
     """
-    # Clear module cache and reload
-    import health_manager_config
-    importlib.reload(health_manager_config)
-
-    prefix     = health_manager_config.PREFIX
-    node_count = health_manager_config.NODE_COUNT
+    prefix     = os.getenv("NODE_PREFIX", "slurm00-htc")
+    node_count = int(os.getenv("NODE_COUNT", "2"))
 
     return [f"{prefix}-{i}" for i in range(1, node_count + 1)]
 
-def wait_for_ssh(node, timeout=300, interval=5):
-    start=time.time()
-    while time.time()-start<timeout:
+async def wait_for_ssh(node, timeout=300, interval=1, connect_timeout=1.5):
+    """
+    Poll TCP port 22 on node until it accepts a connection, without blocking the event loop.
+    Returns True once connected, False after timeout seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
         try:
-            import socket as _s
-            s=_s.socket(_s.AF_INET,_s.SOCK_STREAM)
-            s.settimeout(2)
-            s.connect((node,22))
-            s.close()
+            _, writer = await asyncio.wait_for(asyncio.open_connection(node, 22), connect_timeout)
+            writer.close()
+            await writer.wait_closed()
+            logging.info(f"SSH connection succeeded: {node}")
             return True
-        except:
-            time.sleep(interval)
+        except (OSError, asyncio.TimeoutError):
+            await asyncio.sleep(interval)
+    logging.error(f"SSH connection timeout: {node}")
     return False
 
 def scp_with_retry(src, dst, retries=3, delay=5):
     for i in range(retries):
-        if subprocess.run(["scp","-o","StrictHostKeyChecking=no",src,dst]).returncode==0:
+        if subprocess.run(["scp","-o","StrictHostKeyChecking=no",*SSH_MUX_OPTIONS,src,dst]).returncode==0:
             return True
         time.sleep(delay)
     return False
 
+# Exit code of the remote check command when /tmp/reboot_required was left behind
+REBOOT_REQUIRED_EXIT_CODE = 42
+
+# =============================
+# Async SSH helper
+# =============================
+async def run_ssh(node, remote_cmd, timeout):
+    """
+    Run remote_cmd on node without blocking the event loop.
+    Returns (returncode, stdout, stderr); kills ssh and re-raises on timeout.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ssh", "-o", "StrictHostKeyChecking=no", "-o", "UserKnownHostsFile=/dev/null",
+        *SSH_MUX_OPTIONS, node, remote_cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+async def open_ssh_master(node, timeout=30):
+    """
+    Open a persistent ControlMaster connection to node so that later ssh/scp calls skip the handshake.
+    Failures are only logged: callers fall back to a direct connection.
+    """
+    # The backgrounded master keeps its stdio, so it must not hold our pipes open
+    proc = await asyncio.create_subprocess_exec(
+        "ssh", "-o", "StrictHostKeyChecking=no", "-o", "UserKnownHostsFile=/dev/null",
+        *SSH_MASTER_OPTIONS, node, "true",
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        if await asyncio.wait_for(proc.wait(), timeout=timeout) != 0:
+            logging.debug(f"{node}: SSH master connection not established (rc={proc.returncode})")
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        logging.debug(f"{node}: SSH master connection timed out after {timeout}s")
+
 # =============================
 # Run run_all_nodes_check.py on node
 # =============================
-def run_check_on_node(node):
+async def run_check_on_node(node):
     """
     Run run_all_nodes_check.py on node, and when 
     /tmp/reboot_required appears, restart -> rerun loop.
     Finally, retrieve JSON and return (node, data_dict).
     """
-    # Base SSH commands
-    ssh_cmd = (
-        f"ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null {node} "
-        f"'export CHECK_TIMESTAMP={TIMESTAMP} "
-        f"CHECK_RESULT_DIR={BASE_DIR} "
-        f"PREVIOUS_RESULT_PATH={BASE_DIR}/hpc_check_result_{node}.json "
+    # Remote command executed through ssh
+    # (ssh runs it with the remote shell, so interpolated values are shell-quoted)
+    remote_cmd = (
+        f"export CHECK_TIMESTAMP={shlex.quote(TIMESTAMP)} "
+        f"CHECK_RESULT_DIR={shlex.quote(BASE_DIR)} "
+        f"PREVIOUS_RESULT_PATH={shlex.quote(f'{BASE_DIR}/hpc_check_result_{node}.json')} "
         f"ENABLE_REBOOT_ON_FAILURE=true "
         f"MAX_REBOOT_COUNT={MAX_REBOOT_COUNT} && "
-        f"python3 run_all_nodes_check.py'"
+        f"python3 run_all_nodes_check.py; rc=$?; "
+        # Report the reboot marker through the exit code instead of a second ssh session
+        f"if [ -f /tmp/reboot_required ]; then rm -f /tmp/reboot_required; exit {REBOOT_REQUIRED_EXIT_CODE}; fi; "
+        f"exit $rc"
     )
 
     # Iterate through initial run and optional reboots
     for attempt in range(1, MAX_REBOOT_COUNT + 2):  # +1 initial + MAX retries
-        ret = subprocess.run(ssh_cmd, shell=True, timeout=600).returncode
+        ret, out, err = await run_ssh(node, remote_cmd, timeout=600)
         if ret == 0:
             logging.info(f"{node}: Check Success (exit_code=0)")
+        elif ret == REBOOT_REQUIRED_EXIT_CODE:
+            logging.warning(f"{node}: Check requested a reboot (/tmp/reboot_required)")
         else:
             logging.warning(f"{node}: Check Failure (exit_code={ret})")
+            logging.debug(f"{node}: stdout={out.strip()} stderr={err.strip()}")
 
         # Handle reboot trigger and perform re-check
-        chk = subprocess.run(
-            ["ssh", node, "test -f /tmp/reboot_required"],
-            capture_output=True
-        )
-        if chk.returncode != 0:
+        if ret != REBOOT_REQUIRED_EXIT_CODE:
             logging.debug(f"{node}: /tmp/reboot_required does not exist -> retry terminated")
             break
 
@@ -98,23 +149,14 @@ def run_check_on_node(node):
             break
 
         logging.info(f"{node}: Start Restart (attempt {attempt}/{MAX_REBOOT_COUNT})")
-        subprocess.run(
-            ["ssh", "-o", "StrictHostKeyChecking=no", "-o", "UserKnownHostsFile=/dev/null",
-             node, "sudo reboot"],
-            timeout=30
-        )
+        await run_ssh(node, "sudo reboot", timeout=30)
 
         # Waiting for SSH return
         logging.debug(f"{node}: Sleeping {RECHECK_INTERVAL_SECONDS}s before re-check")
-        time.sleep(RECHECK_INTERVAL_SECONDS)
-        remote_node_utils.wait_for_ssh(node)
-
-        # Waiting for SSH return
-        subprocess.run(
-            ["ssh", "-o", "StrictHostKeyChecking=no", "-o", "UserKnownHostsFile=/dev/null",
-             node, "rm -f /tmp/reboot_required"],
-            timeout=10
-        )
+        await asyncio.sleep(RECHECK_INTERVAL_SECONDS)
+        await wait_for_ssh(node)
+        # The previous master connection died with the reboot
+        await open_ssh_master(node)
 
         # Re-run in the next loop here
 
@@ -143,6 +185,45 @@ def run_check_on_node(node):
     return node, fallback
 
 
+# =============================
+# Check all nodes from one event loop
+# =============================
+async def check_all_nodes(nodes):
+    """
+    Run run_check_on_node for every node concurrently, at most MAX_PARALLEL at a time.
+    Returns the list of result dicts in node order.
+    """
+    sem = asyncio.Semaphore(MAX_PARALLEL)
+
+    os.makedirs(os.path.join(USER_HOME, ".ssh"), mode=0o700, exist_ok=True)
+
+    async def _with_sem(node):
+        async with sem:
+            # Open the multiplexed connection first so the check's ssh/scp calls skip the handshake;
+            # an unreachable node only delays its own check
+            await open_ssh_master(node)
+            return await run_check_on_node(node)
+
+    outcomes = await asyncio.gather(*(_with_sem(node) for node in nodes), return_exceptions=True)
+
+    results = []
+    for node, outcome in zip(nodes, outcomes):
+        if isinstance(outcome, Exception):
+            logging.error(f"{node} Exception during check of {node}: {outcome!r}")
+            # On failure, take fallback action
+            results.append({
+                "node": node,
+                "timestamp": TIMESTAMP,
+                "initial_returncode": 255,
+                "final_returncode": 255,
+                "reboot_count": 0,
+                "error": str(outcome) or repr(outcome)
+            })
+        else:
+            results.append(outcome[1])
+    return results
+
+
 # =============================
 # Main execution entry
 # =============================
@@ -150,26 +231,8 @@ def main():
     # Retrieve VM metadata or resource ID
     nodes = get_nodes()
 
-    results = []
     # Process and save test result data
-    with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as executor:
-        futures = { executor.submit(run_check_on_node, node): node for node in nodes }
-        for fut in as_completed(futures):
-            node = futures[fut]
-            try:
-                _, data = fut.result()
-                results.append(data)
-            except Exception as e:
-                logging.error(f"{node} Exception during check of {node}: {e}")
-                # On failure, take fallback action
-                results.append({
-                    "node": node,
-                    "timestamp": TIMESTAMP,
-                    "initial_returncode": 255,
-                    "final_returncode": 255,
-                    "reboot_count": 0,
-                    "error": str(e)
-                })
+    results = asyncio.run(check_all_nodes(nodes))
 
     # Output to CSV or HTML
     for entry in results:
@@ -184,8 +247,11 @@ def main():
     # Process and save test result data
     tarfile = f"{USER_HOME}/gpu_all_check_{TIMESTAMP}.tar.gz"
     logging.info(f"Archived in: {tarfile}")
+    # Compress with all cores through pigz when available; plain gzip otherwise
+    pigz = shutil.which("pigz")
+    compress_opts = [f"--use-compress-program={pigz} -p {os.cpu_count() or 1}"] if pigz else ["-z"]
     subprocess.run(
-        ["tar", "-czf", tarfile, "-C", f"{USER_HOME}/health_results", TIMESTAMP],
+        ["tar", *compress_opts, "-cf", tarfile, "-C", f"{USER_HOME}/health_results", TIMESTAMP],
         check=False
     )
     
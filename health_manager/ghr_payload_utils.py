@@ -1,8 +1,12 @@
 import os
+import gzip
+import fcntl
 import json
+import atexit
 import logging
 import functools
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone, timedelta
 
 # =============================
@@ -36,10 +40,47 @@ NHC_ERROR_CODES = {
 
 # Log file path
 GHR_LOG_PATH = os.path.expanduser("~/ghr_log.ndjson")
+# Holds only the UTC timestamp of the latest successful submission
+GHR_LAST_SUCCESS_PATH = GHR_LOG_PATH + ".last_success"
+# Rotated history: each rotation appends one gzip member, and gzip.open reads them as one stream
+GHR_LOG_ARCHIVE_PATH = GHR_LOG_PATH + ".gz"
+GHR_LOG_ROTATE_BYTES = int(os.environ.get("GHR_LOG_ROTATE_BYTES", str(1024 * 1024)))
+
+# Append-only descriptor for GHR_LOG_PATH, opened on first use and kept for the process lifetime
+_ghr_log_fd = None
+
+def _get_ghr_log_fd() -> int:
+    global _ghr_log_fd
+    if _ghr_log_fd is None:
+        _ghr_log_fd = os.open(GHR_LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        atexit.register(os.close, _ghr_log_fd)
+    return _ghr_log_fd
+
+def _rotate_ghr_log(fd: int) -> None:
+    """
+    Move the live NDJSON log into GHR_LOG_ARCHIVE_PATH as a new gzip member and truncate it.
+    The caller must hold flock(fd, LOCK_EX) so no entry is appended between read and truncate.
+    """
+    with open(GHR_LOG_PATH, 'rb') as f:
+        data = f.read()
+    with open(GHR_LOG_ARCHIVE_PATH, 'ab') as f:
+        f.write(gzip.compress(data))
+    # Writers use O_APPEND, so they continue at the new end of file
+    os.ftruncate(fd, 0)
 
 # GHR API settings (can be read from config.py, but variables can also be defined here)
 GHR_ENDPOINT = os.environ.get("GHR_ENDPOINT", "https://ghr.example.com/api/v1/ghr")
 
+# Shared HTTP session so retries reuse the pooled TLS connection to GHR_ENDPOINT
+# (retries are handled by the caller, hence max_retries=0)
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Fixed-offset JST timezone (no DST, so a constant offset is exact)
+JST = timezone(timedelta(hours=9))
+
 # Timestamping utility
 def get_current_timestamps() -> tuple[str, str]:
     """
@@ -49,14 +90,35 @@ def get_current_timestamps() -> tuple[str, str]:
     """
 
     # UTC
-    now_utc = datetime.now(timezone.utc).replace(microsecond=0)
-    utc_iso = now_utc.isoformat().replace('+00:00', 'Z')
+    now_utc = datetime.now(timezone.utc)
+    utc_iso = now_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
 
     # JST
-    jst = now_utc.astimezone(timedelta(hours=9))
-    jst_iso = jst.isoformat()
+    jst_iso = now_utc.astimezone(JST).strftime('%Y-%m-%dT%H:%M:%S+09:00')
     return utc_iso, jst_iso
 
+# Chunked NDJSON reader
+def iter_ndjson(path: str, chunk: int = 8192):
+    """
+    Yield the raw lines (bytes, without the newline) of an NDJSON file from first to last,
+    reading fixed-size chunks instead of materializing the file.
+    Paths ending in '.gz' are read through gzip (concatenated members included).
+    """
+    opener = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb', buffering=chunk)
+    with opener as f:
+        tail = b''
+        while True:
+            buf = f.read(chunk)
+            if not buf:
+                break
+            lines = (tail + buf).split(b'\n')
+            tail = lines.pop()
+            for line in lines:
+                if line:
+                    yield line
+        if tail:
+            yield tail
+
 # Decorator: centralize logging and exception resubmission 
 def log_and_reraise(func):
     @functools.wraps(func)
@@ -100,7 +162,7 @@ def submit_ghr_request(payload: dict, method: str = "POST") -> requests.Response
     headers = {"Content-Type": "application/json"}
     if method.upper() not in ("POST", "PUT"):  # default to POST
         method = "POST"
-    resp = requests.request(method, GHR_ENDPOINT, headers=headers, json=payload, timeout=30)
+    resp = _session.request(method, GHR_ENDPOINT, headers=headers, json=payload, timeout=30)
     resp.raise_for_status()
     return resp
 
@@ -118,6 +180,21 @@ def record_ghr_log(status: str, request_id: str, nodes: list[dict]) -> None:
     }
     line = json.dumps(entry)
 
-    # Append the GHR entry to the NDJSON log file
-    with open(GHR_LOG_PATH, 'a', encoding='utf-8') as f:
-        f.write(line + '\n')
\ No newline at end of file
+    # Append the GHR entry to the NDJSON log file.
+    # The exclusive lock spans write, size check and rotation, so concurrent writers neither
+    # lose an entry to the truncate nor archive the same data twice.
+    fd = _get_ghr_log_fd()
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        os.write(fd, (line + '\n').encode('utf-8'))
+        if os.fstat(fd).st_size >= GHR_LOG_ROTATE_BYTES:
+            _rotate_ghr_log(fd)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+    # Update the last-success pointer atomically so readers never see a torn write
+    if status == "success":
+        tmp_path = f"{GHR_LAST_SUCCESS_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(utc)
+        os.replace(tmp_path, GHR_LAST_SUCCESS_PATH)
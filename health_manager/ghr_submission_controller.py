@@ -1,14 +1,20 @@
 import os
-import json
+import re
 import time
+import random
 import logging
+import requests
+from itertools import islice
 from datetime import datetime, timedelta, timezone
 from ghr_payload_utils import (
     build_ghr_payload,
     submit_ghr_request,
     record_ghr_log,
     get_current_timestamps,
-    GHR_LOG_PATH
+    iter_ndjson,
+    GHR_LOG_PATH,
+    GHR_LAST_SUCCESS_PATH,
+    GHR_LOG_ARCHIVE_PATH
 )
 from health_manager_config import (
     ENABLE_GHR,
@@ -24,25 +30,86 @@ from health_manager_config import (
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
+# Byte-level field matchers for the NDJSON scan (entries are written with json.dumps defaults)
+_STATUS_SUCCESS_RE = re.compile(rb'"status":\s*"success"')
+_TIMESTAMP_RE      = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+# HTTP status codes treated as transient (rate limiting / server overload)
+GHR_RETRYABLE_STATUS = (429, 500, 502, 503, 529)
+
+
+def _iter_lines_reverse(path: str, block: int = 8192):
+    """
+    Yield the lines (as bytes) of a file from the newest (last) to the oldest (first).
+    The file is read backwards in fixed-size blocks, so only the tail is touched
+    when the caller stops early.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        pos = os.lseek(fd, 0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            size = min(block, pos)
+            pos -= size
+            lines = (os.pread(fd, size, pos) + tail).split(b"\n")
+            # The first piece may be the end of a line that starts in the previous block
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if tail:
+            yield tail
+    finally:
+        os.close(fd)
+
+def _is_retryable(exc: Exception) -> bool:
+    """
+    True for connection errors, timeouts and transient HTTP statuses; other errors fail fast.
+    """
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    resp = getattr(exc, "response", None)
+    return resp is not None and resp.status_code in GHR_RETRYABLE_STATUS
 
 def has_recent_success(hours: int = GHR_SKIP_HOURS) -> bool:
     """
     Check log file for most recent successful entry; compare by UTC time.
     """
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-    if not os.path.exists(GHR_LOG_PATH):
-        return False
+    # Timestamps are fixed-width UTC ISO8601 with 'Z', so string order equals time order
+    cutoff_iso = (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    # Fast path: the pointer file written by record_ghr_log on every success
+    try:
+        with open(GHR_LAST_SUCCESS_PATH, 'r', encoding='utf-8') as f:
+            last_success = f.read().strip()
+        # Anything other than the fixed-width 'Z' form is ignored and the log is scanned instead
+        if len(last_success) == len(cutoff_iso) and last_success.endswith('Z'):
+            return last_success >= cutoff_iso
+    except FileNotFoundError:
+        # No pointer yet (e.g. log written by an older version): scan the log
+        pass
+
+    cutoff_bytes = cutoff_iso.encode('ascii')
 
     # Search from the newest to the oldest log entry
-    with open(GHR_LOG_PATH, 'r', encoding='utf-8') as f:
-        for line in reversed(f.readlines()):
-            try:
-                entry = json.loads(line)
-                ts = datetime.fromisoformat(entry["timestamp"])
-                if entry.get("status") == "success" and ts >= cutoff:
-                    return True
-            except Exception:
+    if os.path.exists(GHR_LOG_PATH):
+        for line in _iter_lines_reverse(GHR_LOG_PATH):
+            if not _STATUS_SUCCESS_RE.search(line):
+                continue
+            m = _TIMESTAMP_RE.search(line)
+            if m is None:
                 continue
+            # Entries are appended in chronological order, so older ones cannot match either
+            return m.group(1) >= cutoff_bytes
+
+    # No success in the live log (e.g. right after rotation): check the compressed history.
+    # Concatenated gzip members are not seekable, so this is a single forward pass.
+    if os.path.exists(GHR_LOG_ARCHIVE_PATH):
+        for line in iter_ndjson(GHR_LOG_ARCHIVE_PATH):
+            if _STATUS_SUCCESS_RE.search(line):
+                m = _TIMESTAMP_RE.search(line)
+                if m is not None and m.group(1) >= cutoff_bytes:
+                    return True
     return False
 
 def run_ghr_if_needed(all_results: list[dict]) -> None:
@@ -51,41 +118,42 @@ def run_ghr_if_needed(all_results: list[dict]) -> None:
     - Submission frequency: GHR_SKIP_HOURS (hours)
     - Upper limit of number of nodes: GHR_MAX_NODES
     """
+    # One timestamp pair for the whole pre-submission phase
     utc, jst = get_current_timestamps()
+    stamp = f"[{utc}][{jst}]"
 
     # Abort if GHR submission is disabled by config
     if not ENABLE_GHR:
-        logging.info(f"[{utc}][{jst}] GHR disabled by config.")
+        logging.info(f"{stamp} GHR disabled by config.")
         return
 
     # Skip if already succeeded within 24h
     if has_recent_success(GHR_SKIP_HOURS):
-        logging.info(f"[{utc}][{jst}] Skipping GHR: recent success within {GHR_SKIP_HOURS}h.")
+        logging.info(f"{stamp} Skipping GHR: recent success within {GHR_SKIP_HOURS}h.")
         return
 
-    # Extract nodes with errors
-    failed_nodes = []
-    for entry in all_results:
-        codes = (
-            entry.get("nhc_error_codes", []) +
-            entry.get("nccl_error_codes", []) +
-            entry.get("multi_error_codes", [])
-        )
-        if codes:
-            failed_nodes.append({"node": entry.get("node"), "errors": codes})
+    # Extract nodes with errors; stop one past GHR_MAX_NODES, which is enough to detect overflow
+    failed_nodes = list(islice((
+        {
+            "node": e.get("node"),
+            "errors": [*e.get("nhc_error_codes", ()), *e.get("nccl_error_codes", ()), *e.get("multi_error_codes", ())]
+        }
+        for e in all_results
+        if e.get("nhc_error_codes") or e.get("nccl_error_codes") or e.get("multi_error_codes")
+    ), GHR_MAX_NODES + 1))
 
     # Exit if no node is found
     if not failed_nodes:
-        logging.info(f"[{utc}][{jst}] No failure nodes, no GHR submission.")
+        logging.info(f"{stamp} No failure nodes, no GHR submission.")
         return
 
     # Trim the list if the number of failed nodes exceeds the allowed maximum
     if len(failed_nodes) > GHR_MAX_NODES:
-        logging.warning(f"[{utc}][{jst}] Node count ({len(failed_nodes)}) exceeds GHR_MAX_NODES ({GHR_MAX_NODES}), trimming list.")
+        logging.warning(f"{stamp} Node count exceeds GHR_MAX_NODES ({GHR_MAX_NODES}), trimming list.")
         failed_nodes = failed_nodes[:GHR_MAX_NODES]
 
-    # Generate UTC timestamp for payload
-    payload_ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+    # UTC timestamp for payload (same format as get_current_timestamps' UTC value)
+    payload_ts = utc
     payload = build_ghr_payload(
         category=GHR_IMPACT_CATEGORY,
         description=GHR_IMPACT_DESCRIPTION,
@@ -97,19 +165,25 @@ def run_ghr_if_needed(all_results: list[dict]) -> None:
     
     for attempt in range(1, GHR_MAX_RETRIES + 1):
         utc, jst = get_current_timestamps()
+        stamp = f"[{utc}][{jst}]"
+        retry = False
         try:
             res = submit_ghr_request(payload, method=GHR_METHOD)
             status = "success"
-            logging.info(f"[{utc}][{jst}] GHR batch succeeded on attempt {attempt}.")
+            logging.info(f"{stamp} GHR batch succeeded on attempt {attempt}.")
         except Exception as e:
             status = "failure"
-            logging.warning(f"[{utc}][{jst}] GHR batch attempt {attempt} failed: {e}")
-            time.sleep(GHR_RETRY_INTERVAL)
+            retry = _is_retryable(e) and attempt < GHR_MAX_RETRIES
+            logging.warning(f"{stamp} GHR batch attempt {attempt} failed{'' if retry else ' (not retrying)'}: {e}")
         finally:
             req_id = payload.get("properties", {}).get("requestId", "")
             record_ghr_log(status, req_id, failed_nodes)
-        if status == "success":
+        if not retry:
             break
 
+        # Exponential backoff with jitter so that retries from several hosts do not synchronize
+        time.sleep(GHR_RETRY_INTERVAL * 2 ** (attempt - 1) * random.uniform(0.5, 1.0) + random.random())
+
     utc, jst = get_current_timestamps()
-    logging.info(f"[{utc}][{jst}] GHR process completed.")
\ No newline at end of file
+    stamp = f"[{utc}][{jst}]"
+    logging.info(f"{stamp} GHR process completed.")
\ No newline at end of file
@@ -31,6 +31,8 @@ os.environ["CHECK_RESULT_DIR"] = BASE_DIR
 RESULT_DIR     = BASE_DIR
 NODE_NAME      = socket.gethostname()
 RESULT_FILE    = os.path.join(RESULT_DIR, f"hpc_check_result_{NODE_NAME}.json")
+# Reboot counter (plain ASCII integer); kept in RESULT_DIR because /var/run and /tmp do not survive a reboot
+REBOOT_COUNT_FILE = os.path.join(RESULT_DIR, f".reboot_count_{NODE_NAME}")
 RECHECK_INTERVAL_SECONDS = int(os.getenv("RECHECK_INTERVAL_SECONDS", "30"))
 
 # =============================
@@ -38,8 +40,11 @@ RECHECK_INTERVAL_SECONDS = int(os.getenv("RECHECK_INTERVAL_SECONDS", "30"))
 # =============================
 PREFIX           = os.getenv("NODE_PREFIX", "slurm00-htc")
 NODE_COUNT       = int(os.getenv("NODE_COUNT", "2"))
-MAX_PARALLEL     = int(os.getenv("MAX_PARALLEL", "10"))
+MAX_PARALLEL     = int(os.getenv("MAX_PARALLEL", "64"))
 MAX_REBOOT_COUNT = int(os.getenv("MAX_REBOOT_COUNT", "1"))
+# Run NHC / NCCL single / NCCL multi concurrently on a node (they share the GPUs, so measured
+# bandwidth can drop while they overlap; keep off unless wall time matters more)
+PARALLEL_CHECKS  = os.getenv("PARALLEL_CHECKS", "false").lower() in ("1","true","yes")
 
 # =============================
 # NHC settings
@@ -2,10 +2,13 @@
 import os
 import subprocess
 import json
+import mmap
+import functools
 import logging
 from datetime import datetime
 from pathlib import Path
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from report_generator import upgrade_nhc, fetch_imds_resource_id
 from health_manager_config import (
     RESULT_DIR,
@@ -13,22 +16,113 @@ from health_manager_config import (
     NODE_NAME,
     NODE_COUNT,
     RESULT_FILE,
+    REBOOT_COUNT_FILE,
     HEALTH_CHECK_SCRIPT,
     HEALTH_CHECK_VERSION,
     NHC_UPGRADE,
     NCCL_BW_THRESHOLD,
     NCCL_MULTI_BW_THRESHOLD,
+    PARALLEL_CHECKS,
     PREFIX        as NODE_PREFIX
 )
 
 logging.basicConfig(level=logging.DEBUG, format='[%(levelname)s] %(message)s')
 
+# Cluster nodes taking part in the multi-node NCCL test (fixed for the process lifetime)
+NODES = tuple(f"{NODE_PREFIX}-{i}" for i in range(1, NODE_COUNT+1))
+
+# NHC log scanner: group 1 = physical host, 2 = VM name, 3 = NHC code, 4 = FAIL/Error marker
+_NHC_RE = re.compile(
+    rb"^PHYSICAL HOST NAME:(.*)$|^VM NAME:(.*)$|\b(NHC\d{4})\b|(FAIL|Error)",
+    re.MULTILINE
+)
+# Only the end of the NHC log is kept in the result JSON; the full log stays at log_path
+NHC_LOG_TAIL_BYTES = 64 * 1024
+
+def _scan_nhc_log(log_path):
+    """
+    Scan the NHC log in place (mmap, no read() copy).
+    Returns: ok (bool), nhc_error_codes (list), physical (str), vmname (str), log tail (str)
+    """
+    nhc_error_codes = []
+    ok = True
+    physical = ""
+    vmname = ""
+    with open(log_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ok, nhc_error_codes, physical, vmname, ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            logging.debug(f"{NODE_NAME}: NHC log length={len(mm)} bytes")
+            # Single pass over the log: NHC codes, FAIL/Error markers, physical and VM names
+            for m in _NHC_RE.finditer(mm):
+                host, vm, code = m.group(1, 2, 3)
+                if code is not None:
+                    nhc_error_codes.append(code.decode())
+                elif host is not None:
+                    physical = host.decode(errors="replace").strip()
+                elif vm is not None:
+                    vmname = vm.decode(errors="replace").strip()
+                else:
+                    ok = False
+            tail = mm[-NHC_LOG_TAIL_BYTES:].decode(errors="replace")
+    return ok, nhc_error_codes, physical, vmname, tail
+
+# =============================
+# Fast GPU sanity gate
+# =============================
+# Result cells of the `dcgmi diag` table, e.g. "| Memory | Pass |" or "| Fail - GPU: 0 |"
+_DCGM_RESULT_RE = re.compile(r"\|\s*(Pass|Fail|Skip|Warn)\b")
+
+def _dcgmi_quick_check():
+    """
+    ~10s GPU probe run before NHC / NCCL.
+    Returns: ok (bool), codes (list: NHC2015 = nvidia-smi reports an unhealthy GPU,
+             NHC2020 = DCGM level-1 diagnostic failure)
+    Tools that are missing or cannot run are skipped, not treated as failures.
+    """
+    if NODE_NAME.endswith("-scheduler"):
+        return True, []
+
+    codes = []
+    # nvidia-smi can exit 0 while printing ERR! for a GPU it cannot query
+    try:
+        r = subprocess.run(
+            ["nvidia-smi", "--query-gpu=gpu_name", "--format=csv,noheader"],
+            capture_output=True, text=True, timeout=20
+        )
+        if r.returncode != 0 or "ERR!" in r.stdout:
+            logging.error(f"{NODE_NAME}: nvidia-smi reports unhealthy GPU (rc={r.returncode}): {r.stdout.strip()}")
+            codes.append("NHC2015")
+    except FileNotFoundError:
+        logging.debug(f"{NODE_NAME}: nvidia-smi not found, skipping GPU query")
+    except subprocess.TimeoutExpired:
+        logging.error(f"{NODE_NAME}: nvidia-smi GPU query timed out")
+        codes.append("NHC2015")
+
+    # DCGM level-1 diagnostic
+    try:
+        r = subprocess.run(["dcgmi", "diag", "-r", "1"], capture_output=True, text=True, timeout=20)
+        results = _DCGM_RESULT_RE.findall(r.stdout)
+        if r.returncode != 0 and not results:
+            # e.g. host engine not running: no result table, so no verdict on the GPUs
+            logging.debug(f"{NODE_NAME}: dcgmi diag unavailable (rc={r.returncode}): {(r.stderr or r.stdout).strip()}")
+        elif "Fail" in results:
+            logging.error(f"{NODE_NAME}: dcgmi diag -r 1 failed:\n{r.stdout.strip()}")
+            codes.append("NHC2020")
+    except FileNotFoundError:
+        logging.debug(f"{NODE_NAME}: dcgmi not found, skipping DCGM diag")
+    except subprocess.TimeoutExpired:
+        logging.warning(f"{NODE_NAME}: dcgmi diag -r 1 timed out, skipping")
+
+    return not codes, codes
+
+
 # =============================
 # Optionally upgrade NHC scripts
 # =============================
 def run_gpu_health_check():
     """GPU ヘルスチェック via Azure NHC
-    戻り値: ok (bool), detail (dict with keys "log", "nhc_error_codes"), physical_host_name (str), vm_name (str)
+    戻り値: ok (bool), detail (dict with keys "log" (末尾 NHC_LOG_TAIL_BYTES), "log_path", "nhc_error_codes"), physical_host_name (str), vm_name (str)
     """
     if NODE_NAME.endswith("-scheduler"):
         return True, {"log": ""}, "", ""
@@ -37,9 +131,10 @@ def run_gpu_health_check():
     cmd = [HEALTH_CHECK_SCRIPT, "-a", "--output", log_path]
     logging.debug(f"{NODE_NAME}: Running NHC command: {' '.join(cmd)}")
     try:
+        # The report goes to log_path; only stderr is kept for the failure message
         r = subprocess.run(
             cmd,
-            stdout=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=True,
             timeout=120
@@ -49,28 +144,12 @@ def run_gpu_health_check():
             logging.error(f"{NODE_NAME}: NHC script failed: stderr={r.stderr.strip()}")
             return False, {"log": "", "nhc_error_codes": []}, "", ""
 
-        with open(log_path) as f:
-            txt = f.read()
-        logging.debug(f"{NODE_NAME}: NHC log length={len(txt)} characters")
-
-        # Optionally upgrade NHC scripts
-        nhc_error_codes = re.findall(r"\b(NHC\d{4})\b", txt)
+        ok, nhc_error_codes, physical, vmname, log_tail = _scan_nhc_log(log_path)
         logging.debug(f"{NODE_NAME}: Extracted NHC error codes: {nhc_error_codes}")
 
-        # Check NHC log for FAIL or Error to determine status
-        ok = ("FAIL" not in txt) and ("Error" not in txt)
-        # # Extract physical and VM name from logs
-        physical = ""
-        vmname = ""
-        for line in txt.splitlines():
-            if line.startswith("PHYSICAL HOST NAME:"):
-                physical = line.split(":", 1)[1].strip()
-            elif line.startswith("VM NAME:"):
-                vmname = line.split(":", 1)[1].strip()
-
         logging.info(f"{NODE_NAME}: NHC check {'PASSED' if ok else 'FAILED'}, physical={physical}, vm={vmname}")
-        # Returns: ok, detail(log and error code), physical, vmname
-        return ok, {"log": txt, "nhc_error_codes": nhc_error_codes}, physical, vmname
+        # Returns: ok, detail(log tail, log path and error code), physical, vmname
+        return ok, {"log": log_tail, "log_path": log_path, "nhc_error_codes": nhc_error_codes}, physical, vmname
 
     except subprocess.TimeoutExpired as te:
         logging.error(f"{NODE_NAME}: NHC timeout after 120s: {te}")
@@ -80,6 +159,144 @@ def run_gpu_health_check():
         return False, {"log": "", "nhc_error_codes": []}, "", ""
 
 
+# =============================
+# NCCL log parsing
+# =============================
+# The 4G row is printed at the end of all_reduce_perf output, so only the tail is read
+NCCL_LOG_TAIL_BYTES = 8192
+
+def _busbw_from_row(line):
+    """Bus bandwidth (column 7) of an all_reduce_perf result row, or None if it is malformed."""
+    try:
+        return float(line.split()[6])
+    except (IndexError, ValueError):
+        return None
+
+def _parse_nccl_busbw(log_path):
+    """
+    Return the bus bandwidth (column 7) of the 4G row of an all_reduce_perf log, or None.
+    Errors opening/reading the log propagate to the caller.
+    """
+    with open(log_path, "rb") as f:
+        start = max(0, os.fstat(f.fileno()).st_size - NCCL_LOG_TAIL_BYTES)
+        f.seek(start)
+        lines = f.read().decode("utf-8", errors="replace").splitlines()
+        if start > 0 and lines:
+            lines.pop(0)  # partial line at the seek position
+        for line in reversed(lines):
+            if line.strip().startswith("4G"):
+                return _busbw_from_row(line)
+        if start == 0:
+            return None
+        # Trailing output (e.g. mpirun teardown warnings on stderr) pushed the row out of the tail
+        f.seek(0)
+        for raw in f:
+            line = raw.decode("utf-8", errors="replace")
+            if line.strip().startswith("4G"):
+                return _busbw_from_row(line)
+    return None
+
+# Error codes of each test: (log parse failure, no 4G bandwidth, below threshold)
+NCCL_SINGLE_CODES = ("NCCL1004", "NCCL1005", "NCCL1006")
+NCCL_MULTI_CODES  = ("NCCL_MULTI1005", "NCCL_MULTI1006", "NCCL_MULTI1007")
+
+def _classify_nccl(log_path, threshold, codes):
+    """
+    Parse the 4G bus bandwidth of an all_reduce_perf log and judge it against threshold.
+    codes: NCCL_SINGLE_CODES or NCCL_MULTI_CODES
+    Returns: passed (bool), busbw (float | None), error codes (list)
+    """
+    parse_code, no_bw_code, low_bw_code = codes
+    error_codes = []
+    busbw = None
+    try:
+        busbw = _parse_nccl_busbw(log_path)
+    except Exception as e:
+        logging.error(f"{NODE_NAME}: Failed to parse NCCL log {log_path}: {e}")
+        error_codes.append(parse_code)
+
+    if busbw is None:
+        error_codes.append(no_bw_code)
+        return False, None, error_codes
+
+    passed = busbw >= threshold
+    if not passed:
+        error_codes.append(low_bw_code)
+    return passed, busbw, error_codes
+
+
+# Exits 3 when torch is not installed, so a missing probe is not mistaken for a CUDA failure
+_CUDA_PROBE_SCRIPT = (
+    "import sys\n"
+    "try:\n"
+    "    import torch\n"
+    "except ImportError:\n"
+    "    sys.exit(3)\n"
+    "torch.ones(1 << 20, device='cuda').sum().item()\n"
+)
+
+@functools.lru_cache(maxsize=1)
+def _cuda_alloc_probe():
+    """
+    Allocate and reduce a small CUDA tensor with PyTorch (catches CUDA init failures
+    that nvidia-smi and NHC miss). Returns False only on a failed probe; True if it
+    passed or torch is unavailable. Cached until cache_clear() at the next iteration.
+    lru_cache does not make concurrent callers wait, so threaded callers must be preceded
+    by one call that fills the cache (see main()).
+    """
+    try:
+        r = subprocess.run(["python3", "-c", _CUDA_PROBE_SCRIPT], capture_output=True, text=True, timeout=10)
+    except subprocess.TimeoutExpired:
+        logging.error(f"{NODE_NAME}: CUDA allocation probe timed out")
+        return False
+    if r.returncode == 3:
+        logging.debug(f"{NODE_NAME}: torch not available, skipping CUDA allocation probe")
+        return True
+    if r.returncode != 0:
+        logging.error(f"{NODE_NAME}: CUDA allocation probe failed (rc={r.returncode}): {r.stderr.strip()}")
+        return False
+    return True
+
+def _count_gpus(nvidia_smi_list_output):
+    """Count the "GPU <n>: ..." lines printed by `nvidia-smi -L`."""
+    return sum(1 for line in nvidia_smi_list_output.splitlines() if line.startswith("GPU "))
+
+
+# =============================
+# NCCL test execution
+# =============================
+# A single 4G run decides healthy nodes; the full size sweep is only rerun for its diagnostic trace
+NCCL_COARSE_ARGS = "-b 4G -e 4G -f 2 -g 1"
+NCCL_SWEEP_ARGS  = "-b 8 -e 4G -f 2 -g 1"
+# Coarse busbw below this fraction of the threshold (or unparsable) triggers the full sweep
+NCCL_SWEEP_FALLBACK_RATIO = 0.5
+
+def _run_all_reduce_perf(cmd, log_path, timeout):
+    """Run an all_reduce_perf command line with OpenMPI loaded, writing its output to log_path."""
+    with open(log_path, "w", encoding="utf-8") as f:
+        subprocess.run(
+            ["bash", "-lc", f"source /etc/profile.d/modules.sh && module load mpi/openmpi && {cmd}"],
+            stdout=f,
+            stderr=subprocess.STDOUT,
+            timeout=timeout
+        )
+
+def _run_nccl_coarse_then_sweep(cmd, log_path, threshold, codes, coarse_timeout, sweep_timeout):
+    """
+    Run the coarse 4G-only test, falling back to the full sweep when it is unparsable or far below threshold.
+    Execution errors (e.g. timeout) propagate to the caller.
+    Returns: passed (bool), busbw (float | None), error codes (list) as _classify_nccl
+    """
+    _run_all_reduce_perf(f"{cmd} {NCCL_COARSE_ARGS}", log_path, coarse_timeout)
+    result = _classify_nccl(log_path, threshold, codes)
+    busbw = result[1]
+    if busbw is not None and busbw >= threshold * NCCL_SWEEP_FALLBACK_RATIO:
+        return result
+    logging.info(f"{NODE_NAME}: Coarse NCCL run busbw={busbw}, rerunning full sweep for diagnostics")
+    _run_all_reduce_perf(f"{cmd} {NCCL_SWEEP_ARGS}", log_path, sweep_timeout)
+    return _classify_nccl(log_path, threshold, codes)
+
+
 # =============================
 # NCCL stand-alone
 # =============================
@@ -97,7 +314,7 @@ def run_nccl_test():
     # 1) Check the number of GPUs
     try:
         r = subprocess.run(["nvidia-smi", "-L"], capture_output=True, text=True, timeout=10)
-        gpu_count = len(set(r.stdout.splitlines()))
+        gpu_count = _count_gpus(r.stdout)
         logging.debug(f"{NODE_NAME}: Found {gpu_count} GPUs")
         if gpu_count == 0:
             nccl_error_codes.append("NCCL1001")
@@ -111,50 +328,26 @@ def run_nccl_test():
         # Retrieve VM metadata or resource ID
         return None, None, []
 
-    cmd = (
-        "source /etc/profile.d/modules.sh && module load mpi/openmpi "
-        "&& all_reduce_perf -b 8 -e 4G -f 2 -g 1"
-    )
+    # CUDA liveness: fail fast instead of letting all_reduce_perf hang until the timeout
+    if not _cuda_alloc_probe():
+        nccl_error_codes.append("NCCL1000")
+        return False, 0.0, nccl_error_codes
+
+    cmd = "all_reduce_perf"
     logging.debug(f"{NODE_NAME}: Running NCCL test command: {cmd}")
     try:
-        with open(log_path, "w", encoding="utf-8") as f:
-            subprocess.run(
-                ["bash", "-lc", cmd],
-                stdout=f,
-                stderr=subprocess.STDOUT,
-                timeout=60
-            )
+        # Determine if measured NCCL bandwidth meets the threshold
+        passed, bandwidth, codes = _run_nccl_coarse_then_sweep(
+            cmd, log_path, NCCL_BW_THRESHOLD, NCCL_SINGLE_CODES, coarse_timeout=15, sweep_timeout=60
+        )
     except Exception as e:
         logging.error(f"{NODE_NAME}: NCCL test execution failed: {e}")
         nccl_error_codes.append("NCCL1003")
         return False, 0.0, nccl_error_codes
-    
-    # Process and save test result data
-    bandwidth = None
-    try:
-        with open(log_path, encoding="utf-8") as f:
-            for line in f:
-                if line.strip().startswith("4G"):
-                    parts = line.split()
-                    try:
-                        bandwidth = float(parts[6])
-                    except Exception:
-                        pass
-                    break
-    except Exception as e:
-        logging.error(f"{NODE_NAME}: Failed to parse NCCL log: {e}")
-        nccl_error_codes.append("NCCL1004")
-
+    nccl_error_codes.extend(codes)
     if bandwidth is None:
-        # Retrieve VM metadata or resource ID
-        nccl_error_codes.append("NCCL1005")
         return False, 0.0, nccl_error_codes
 
-    # Determine if measured NCCL bandwidth meets the threshold
-    passed = bandwidth >= NCCL_BW_THRESHOLD
-    if not passed:
-        nccl_error_codes.append("NCCL1006")
-
     # Log the result and return status, bandwidth, and error codes
     logging.info(f"{NODE_NAME}: NCCL test {'PASSED' if passed else 'FAILED'}: bw={bandwidth} MB/s, errors={nccl_error_codes}")
     return passed, bandwidth, nccl_error_codes
@@ -163,11 +356,24 @@ def run_nccl_test():
 # =============================
 # NCCL multi-node
 # =============================
+def _probe_gpu_count(node):
+    """Return the number of GPUs on node (raises if ssh or nvidia-smi fails)."""
+    r = subprocess.run(
+        ["ssh", node, "nvidia-smi -L"],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    if r.returncode != 0:
+        raise RuntimeError(f"nvidia-smi -L exited with {r.returncode}: {r.stderr.strip()}")
+    return _count_gpus(r.stdout)
+
 def run_nccl_multi_node_test():
     """Return multi-node NCCL test results
-    Return: dict {"nodes": list of node names, "busbw": float | "N/A", "passed": bool | "N/A", "multi_error_codes": list of str}
+    Return: dict {"nodes": tuple of node names, "busbw": float | "N/A", "passed": bool | "N/A", "multi_error_codes": list of str}
+    When the GPU precheck fails, "gpu_counts" ({node: int | None}) is added for reporting.
     """
-    nodes = [f"{NODE_PREFIX}-{i}" for i in range(1, NODE_COUNT+1)]
+    nodes = NODES
     multi_error_codes = []
 
     # Skip when the number of nodes is insufficient
@@ -175,68 +381,49 @@ def run_nccl_multi_node_test():
         multi_error_codes.append("NCCL_MULTI1001")  # Insufficient number of nodes
         return {"nodes": nodes, "busbw": "N/A", "passed": "N/A", "multi_error_codes": multi_error_codes}
 
-    # Check the number of GPUs on each node
-    for n in nodes:
-        try:
-            r = subprocess.run(
-                ["ssh", n, "nvidia-smi -L | wc -l"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            gpu_count = int(r.stdout.strip())
-            logging.debug(f"{n}: GPU count={gpu_count}")
-            if gpu_count < 8:
-                multi_error_codes.append("NCCL_MULTI1002")  # Insufficient GPUs
-                return {"nodes": nodes, "busbw": "N/A", "passed": "N/A", "multi_error_codes": multi_error_codes}
-        except Exception as e:
-            logging.error(f"{n}: Failed GPU count check: {e}")
-            multi_error_codes.append("NCCL_MULTI1003")  # GPU count check failed
-            return {"nodes": nodes, "busbw": "N/A", "passed": "N/A", "multi_error_codes": multi_error_codes}
+    # Check the number of GPUs on all nodes in parallel (None = probe failed)
+    gpu_counts = dict.fromkeys(nodes)
+    with ThreadPoolExecutor(max_workers=min(len(nodes), 32)) as ex:
+        futures = {ex.submit(_probe_gpu_count, n): n for n in nodes}
+        for fut in as_completed(futures):
+            n = futures[fut]
+            try:
+                gpu_counts[n] = fut.result()
+                logging.debug(f"{n}: GPU count={gpu_counts[n]}")
+            except Exception as e:
+                logging.error(f"{n}: Failed GPU count check: {e}")
+    if any(c is None for c in gpu_counts.values()):
+        multi_error_codes.append("NCCL_MULTI1003")  # GPU count check failed
+    if any(c is not None and c < 8 for c in gpu_counts.values()):
+        multi_error_codes.append("NCCL_MULTI1002")  # Insufficient GPUs
+    if multi_error_codes:
+        return {"nodes": nodes, "busbw": "N/A", "passed": "N/A", "multi_error_codes": multi_error_codes,
+                "gpu_counts": gpu_counts}
+
+    # CUDA liveness on this node (result shared with run_nccl_test within the iteration)
+    if not _cuda_alloc_probe():
+        multi_error_codes.append("NCCL_MULTI1000")  # CUDA allocation probe failed
+        return {"nodes": nodes, "busbw": "N/A", "passed": False, "multi_error_codes": multi_error_codes}
 
     cmd = (
         f"mpirun -np {len(nodes)} -host {','.join(nodes)} "
-        "/opt/nccl-tests/build/all_reduce_perf -b 8 -e 4G -f 2 -g 1"
+        "/opt/nccl-tests/build/all_reduce_perf"
     )
     log_path = os.path.join(RESULT_DIR, "nccl_multi.log")
     logging.debug(f"Multi-node NCCL cmd: {cmd}")
     try:
-        with open(log_path, "w", encoding="utf-8") as f:
-            subprocess.run(
-                ["bash", "-lc", f"source /etc/profile.d/modules.sh && module load mpi/openmpi && {cmd}"],
-                stdout=f,
-                stderr=subprocess.STDOUT,
-                timeout=180
-            )
+        # The coarse run keeps a wider timeout than single-node to cover mpirun start-up across nodes
+        passed, busbw, codes = _run_nccl_coarse_then_sweep(
+            cmd, log_path, NCCL_MULTI_BW_THRESHOLD, NCCL_MULTI_CODES, coarse_timeout=60, sweep_timeout=180
+        )
     except Exception as e:
         logging.error(f"{NODE_NAME}: NCCL multi-node execution failed: {e}")
         multi_error_codes.append("NCCL_MULTI1004")  # Test execution failure
         return {"nodes": nodes, "busbw": "N/A", "passed": False, "multi_error_codes": multi_error_codes}
-
-    # Process and save test result data
-    busbw = None
-    try:
-        with open(log_path, encoding="utf-8") as f:
-            for line in f:
-                if line.strip().startswith("4G"):
-                    parts = line.split()
-                    try:
-                        busbw = float(parts[6])
-                    except Exception:
-                        pass
-                    break
-    except Exception as e:
-        logging.error(f"{NODE_NAME}: Failed to parse multi-node log: {e}")
-        multi_error_codes.append("NCCL_MULTI1005")  # Log parsing failure
-
+    multi_error_codes.extend(codes)
     if busbw is None:
-        multi_error_codes.append("NCCL_MULTI1006")  # Failed to acquire bandwidth
         return {"nodes": nodes, "busbw": "N/A", "passed": False, "multi_error_codes": multi_error_codes}
 
-    passed = busbw >= NCCL_MULTI_BW_THRESHOLD
-    if not passed:
-        multi_error_codes.append("NCCL_MULTI1007")  # Bandwidth threshold not reached
-
     logging.info(f"{NODE_NAME}: NCCL multi-node {'PASSED' if passed else 'FAILED'}: busbw={busbw}, errors={multi_error_codes}")
     return {"nodes": nodes, "busbw": busbw, "passed": passed, "multi_error_codes": multi_error_codes}
 
@@ -244,9 +431,30 @@ def run_nccl_multi_node_test():
 # =============================
 # Save or load result JSON
 # =============================
+def _read_reboot_count():
+    """Return the persisted reboot count, or None when no counter has been written yet."""
+    try:
+        with open(REBOOT_COUNT_FILE, encoding="ascii") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        return 0
+
+def _write_reboot_count(count):
+    tmp_path = f"{REBOOT_COUNT_FILE}.tmp"
+    with open(tmp_path, "w", encoding="ascii") as f:
+        f.write(str(count))
+    os.replace(tmp_path, REBOOT_COUNT_FILE)
+
 def save_result(res):
-    with open(RESULT_FILE,"w") as f:
+    # Write-then-rename so a crash never leaves a truncated result behind
+    tmp_path = f"{RESULT_FILE}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(res, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, RESULT_FILE)
     logging.info(f"Save Result: {RESULT_FILE}")
 
 
@@ -261,36 +469,53 @@ def main():
         upgrade_nhc()
 
     # Process and save test result data
-    prev_path = os.environ.get("PREVIOUS_RESULT_PATH", "")
-    if os.path.exists(RESULT_FILE):
-        try:
-            prev = json.load(open(RESULT_FILE))
-            reboot_count = int(prev.get("reboot_count", 0))
-            logging.debug(f"Loaded previous reboot_count={reboot_count}")
-        except Exception:
-            reboot_count = 0
-    else:
+    reboot_count = _read_reboot_count()
+    if reboot_count is None:
+        # No counter file yet: fall back to the previous result JSON given by the orchestrator
         reboot_count = 0
-
-    if prev_path and os.path.exists(prev_path):
-        try:
-            prev = json.load(open(prev_path, "r", encoding="utf-8"))
-            reboot_count = int(prev.get("reboot_count", 0))
-        except Exception:
-            reboot_count = 0
+        prev_path = os.environ.get("PREVIOUS_RESULT_PATH", "")
+        if prev_path and os.path.exists(prev_path):
+            try:
+                with open(prev_path, "r", encoding="utf-8") as f:
+                    reboot_count = int(json.load(f).get("reboot_count", 0))
+            except Exception:
+                reboot_count = 0
+    logging.debug(f"Loaded previous reboot_count={reboot_count}")
     ENABLE = os.environ.get("ENABLE_REBOOT_ON_FAILURE", "false").lower() in ("1", "true", "yes")
     MAXR = int(os.environ.get("MAX_REBOOT_COUNT", "0"))
 
     iteration = 0
     while True:
         iteration += 1
+        # A reboot may have fixed CUDA, so probe again in every iteration
+        _cuda_alloc_probe.cache_clear()
         logging.debug(f"[Loop {iteration}] Starting health check iteration, reboot_count={reboot_count}")
 
+        # Cheap GPU sanity gate: obviously broken GPUs skip the long NHC / NCCL runs
+        gate_ok, gate_codes = _dcgmi_quick_check()
+
         # Run NCCL or NHC test
-        gpu_ok, gpu_detail, physical, vmname = run_gpu_health_check()
+        if not gate_ok:
+            gpu_ok, gpu_detail, physical, vmname = False, {"log": "", "nhc_error_codes": gate_codes}, "", ""
+            nccl_ok, nccl_bw, nccl_err_codes = None, None, []
+            multi = {"nodes": [], "busbw": "N/A", "passed": "N/A", "multi_error_codes": []}
+        elif PARALLEL_CHECKS:
+            # Fill the CUDA probe cache first; otherwise both NCCL threads miss it and probe at once
+            _cuda_alloc_probe()
+            # The checks mostly wait on their subprocesses, so threads overlap them
+            with ThreadPoolExecutor(max_workers=3) as ex:
+                f_gpu   = ex.submit(run_gpu_health_check)
+                f_nccl  = ex.submit(run_nccl_test)
+                f_multi = ex.submit(run_nccl_multi_node_test)
+                gpu_ok, gpu_detail, physical, vmname = f_gpu.result()
+                nccl_ok, nccl_bw, nccl_err_codes = f_nccl.result()
+                multi = f_multi.result()
+        else:
+            gpu_ok, gpu_detail, physical, vmname = run_gpu_health_check()
+            nccl_ok, nccl_bw, nccl_err_codes = run_nccl_test()
+            multi = run_nccl_multi_node_test()
         nhc_err_codes = gpu_detail.get("nhc_error_codes", [])
 
-        nccl_ok, nccl_bw, nccl_err_codes = run_nccl_test()
         # Skip display if skipped due to lack of GPU, etc.
         nccl_display = (
             "Skip" if nccl_ok is None
@@ -303,7 +528,6 @@ def main():
         if nccl_ok is None:
             nccl_err_codes = []  # Do not treat Skip as an error
 
-        multi = run_nccl_multi_node_test()
         multi_ok = multi.get("passed")
         multi_err_codes = multi.get("multi_error_codes", [])
         # Format multi-node NCCL test result for display
@@ -337,7 +561,7 @@ def main():
 
             # GPU
             "gpu_check":            gpu_ok,
-            "gpu_detail":           gpu_detail,      # {"log": "..."}
+            "gpu_detail":           gpu_detail,      # {"log": "<tail>", "log_path": "...", ...}
             "error_codes":          nhc_err_codes + nccl_err_codes + multi_err_codes,
 
             # NCCL Status for Single HTML
@@ -348,6 +572,8 @@ def main():
 
             # NCCL Multi (already flattened)
             "nccl_multi_nodes":     multi["nodes"],
+            # Per-node GPU counts, only present when the multi-node GPU precheck failed
+            "nccl_multi_gpu_counts": multi.get("gpu_counts"),
             # Enable N/A display in HTML layer
             "nccl_multi_bw": multi["busbw"] if isinstance(multi["busbw"], (int, float)) else None,
             # Return code
@@ -377,8 +603,8 @@ def main():
             Path("/tmp/reboot_required").touch()
             # Save or load result JSON
             reboot_count += 1
-            save_result({**result, "reboot_count": reboot_count})
-            logging.debug(f"[Loop {iteration}] Wrote intermediate JSON, reboot_count={reboot_count}")       
+            _write_reboot_count(reboot_count)
+            logging.debug(f"[Loop {iteration}] Wrote reboot counter, reboot_count={reboot_count}")
             # Wait for orchestrator to reboot us, then continue loop
             continue
 
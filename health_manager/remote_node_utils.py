@@ -1,4 +1,5 @@
 import os
+import shlex
 import subprocess
 import socket
 import time
@@ -12,6 +13,39 @@ from node_health_check_runner import (
     NCCL_MULTI_BW_THRESHOLD
 )
 
+# ============================
+# SSH connection multiplexing
+# ============================
+# Later ssh/scp calls to the same host reuse the master socket instead of a new handshake
+SSH_CONTROL_PATH   = "~/.ssh/cm-%r@%h:%p"
+SSH_MUX_OPTIONS    = ["-o", f"ControlPath={SSH_CONTROL_PATH}"]
+# Options for the call that opens (or reuses) the persistent master connection
+SSH_MASTER_OPTIONS = SSH_MUX_OPTIONS + ["-o", "ControlMaster=auto", "-o", "ControlPersist=10m"]
+
+def open_ssh_master(node, timeout=30):
+    """
+    Open (or reuse) the persistent master connection to node.
+
+    :param node: hostname
+    :param timeout: timeout (sec)
+    :return: True if the master is up, False otherwise (callers fall back to direct connections)
+    """
+    # The backgrounded master inherits stdio, so it must not hold pipes we wait on
+    try:
+        r = subprocess.run([
+            "ssh", "-o", "StrictHostKeyChecking=no",
+            "-o", "UserKnownHostsFile=/dev/null",
+            *SSH_MASTER_OPTIONS,
+            node, "true"
+        ], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logging.debug(f"SSH master connection timed out: {node}")
+        return False
+    if r.returncode != 0:
+        logging.debug(f"SSH master connection not established (rc={r.returncode}): {node}")
+        return False
+    return True
+
 # ============================
 # SSH environment variable command assembly 
 # ============================
@@ -43,26 +77,28 @@ def build_ssh_env(remote_home, previous_result_path, remote_script):
 # ============================
 # Wait for SSH reconnect 
 # ============================
-def wait_for_ssh(node, timeout=300, interval=10):
+def wait_for_ssh(node, timeout=300, interval=0.5, max_interval=5, backoff=1.5):
     """
     Wait until SSH connection to the specified node is available.
 
     :param node: hostname 
     :param timeout: timeout (sec) 
-    :param interval: retry interval (sec) 
+    :param interval: initial retry interval (sec), grown by backoff up to max_interval 
+    :param max_interval: upper bound of the retry interval (sec) 
+    :param backoff: interval multiplier after each failed probe 
     :return: True if connection succeeded, False if timeout 
     """
     start = time.time()
     while time.time() - start < timeout:
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(2)
-                s.connect((node, 22))
+            with socket.create_connection((node, 22), timeout=1.0):
+                pass
             logging.info(f"SSH connection succeeded: {node}")
             return True
-        except Exception:
+        except OSError:
             logging.info(f"Waiting for SSH connection...: {node}")
             time.sleep(interval)
+            interval = min(interval * backoff, max_interval)
     logging.error(f"SSH connection timeout: {node}")
     return False
 
@@ -87,6 +123,7 @@ def copy_script_to_node(node, remote_path, local_script, max_retries=5, retry_de
                 "scp",
                 "-o", "StrictHostKeyChecking=no",
                 "-o", "UserKnownHostsFile=/dev/null",
+                *SSH_MUX_OPTIONS,
                 local_script,
                 f"{node}:{remote_path}"
             ]
@@ -145,16 +182,23 @@ def scp_with_retry(src, dst, retries=3, delay=5):
     """
     for i in range(1, retries+1):
         try:
-            subprocess.run([
+            r = subprocess.run([
                 "scp",
                 "-o", "StrictHostKeyChecking=no",
                 "-o", "UserKnownHostsFile=/dev/null",
+                *SSH_MUX_OPTIONS,
                 src, dst
-            ], check=True, timeout=60)
-            return True
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=60)
+            if r.returncode == 0:
+                return True
+            # A missing source will not appear on retry
+            if "No such file" in r.stderr:
+                logging.warning(f"SCP source undetected: {src}")
+                return False
+            logging.warning(f"SCP Retry {i}/{retries} Failure (rc={r.returncode}): {r.stderr.strip()}")
         except Exception as e:
             logging.warning(f"SCP Retry {i}/{retries} Failure: {e}")
-            time.sleep(delay)
+        time.sleep(delay)
     return False
 
 # ============================
@@ -172,19 +216,62 @@ def fetch_remote_json(node, remote_home, timestamp, local_dir):
     """
     remote_path = f"{remote_home}/health_results/{timestamp}/hpc_check_result_{node}.json"
     local_path  = os.path.join(local_dir, f"hpc_check_result_{node}.json")
-    # Existence check
-    check = subprocess.run([
-        "ssh", node, f"test -f {remote_path}"
-    ], capture_output=True)
-    if check.returncode != 0:
-        logging.warning(f"Remote JSON undetected: {node}:{remote_path}")
-        return None
-    # SCP
+    # SCP (a missing file is reported by scp itself, no separate existence check)
     if scp_with_retry(f"{node}:{remote_path}", local_path):
         return local_path
     logging.error(f"JSON acquisition failure: {node}")
     return None
 
+# ============================
+# Parallel JSON Data Collection
+# ============================
+def _fetch_remote_json_cat(node, remote_home, timestamp, local_dir):
+    """
+    Get a JSON result file from a remote node in one SSH round trip (existence check + cat).
+
+    :return: Local file path if success, otherwise None
+    """
+    remote_path = f"{remote_home}/health_results/{timestamp}/hpc_check_result_{node}.json"
+    local_path  = os.path.join(local_dir, f"hpc_check_result_{node}.json")
+    r = subprocess.run([
+        "ssh", "-o", "StrictHostKeyChecking=no",
+        "-o", "UserKnownHostsFile=/dev/null",
+        *SSH_MUX_OPTIONS,
+        node, f"test -f {shlex.quote(remote_path)} && cat {shlex.quote(remote_path)}"
+    ], capture_output=True, timeout=60)
+    if r.returncode != 0:
+        logging.warning(f"Remote JSON undetected (rc={r.returncode}): {node}:{remote_path}")
+        return None
+    with open(local_path, "wb") as f:
+        f.write(r.stdout)
+    return local_path
+
+def fetch_remote_jsons_parallel(nodes, remote_home, timestamp, local_dir, max_workers=16):
+    """
+    Get JSON result files from multiple nodes in parallel.
+
+    :param nodes: List of hostnames
+    :param remote_home: Remote home directory
+    :param timestamp: Check timestamp
+    :param local_dir: Local destination directory
+    :param max_workers: Number of parallel workers
+    :return: {node: local path or None} mapping
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {
+            ex.submit(_fetch_remote_json_cat, node, remote_home, timestamp, local_dir): node
+            for node in nodes
+        }
+        for fut in as_completed(futures):
+            node = futures[fut]
+            try:
+                results[node] = fut.result()
+            except Exception as e:
+                logging.error(f"JSON acquisition failure: {node} - {e}")
+                results[node] = None
+    return results
+
 # ============================
 # Get remote context
 # ============================
@@ -198,10 +285,13 @@ def get_remote_context(node, user=None):
     """
     # Clear host key
     subprocess.run(["ssh-keygen", "-R", node], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # First contact: later ssh/scp calls to this node ride on the master
+    open_ssh_master(node)
     try:
         r = subprocess.run([
             "ssh", "-o", "StrictHostKeyChecking=no",
             "-o", "UserKnownHostsFile=/dev/null",
+            *SSH_MUX_OPTIONS,
             node, "echo $HOME"
         ], capture_output=True, text=True, timeout=10)
         home = r.stdout.strip()
@@ -220,16 +310,18 @@ def handle_reboot_and_recheck(node, remote_home, ssh_env_cmd, result, log_file):
     If /tmp/reboot_required is available, reboot and run recheck, add logs.
     """
     check = subprocess.run([
-        "ssh", node, "test -f /tmp/reboot_required && echo REBOOT"
+        "ssh", *SSH_MUX_OPTIONS, node, "test -f /tmp/reboot_required && echo REBOOT"
     ], capture_output=True, text=True)
     if "REBOOT" not in check.stdout:
         return result
     # Reboot flag
     result["reboot_count"] = result.get("reboot_count",0) + 1
-    subprocess.run(["ssh", node, "sudo reboot"], timeout=10)
+    subprocess.run(["ssh", *SSH_MUX_OPTIONS, node, "sudo reboot"], timeout=10)
     if wait_for_ssh(node):
+        # The old master died with the reboot
+        open_ssh_master(node)
         proc = subprocess.run([
-            "ssh", node, ssh_env_cmd
+            "ssh", *SSH_MUX_OPTIONS, node, ssh_env_cmd
         ], capture_output=True, text=True, timeout=300)
         result["post_reboot_returncode"] = proc.returncode
         with open(log_file, 'a', encoding='utf-8') as f:
@@ -1,10 +1,14 @@
 import os
 import csv
+import html
+import re
 import subprocess, socket, shutil
+import time
+import stat
 import logging
 import requests
 from datetime import datetime
-from report_generator import HEALTH_CHECK_VERSION 
+from health_manager_config import HEALTH_CHECK_VERSION, RESULT_DIR, NODE_NAME
 
 # =============================
 # Optionally upgrade NHC scripts
@@ -16,8 +20,9 @@ def upgrade_nhc():
         if os.path.isdir(nhc_path):
             shutil.rmtree(nhc_path)
         os.makedirs(os.path.dirname(nhc_path), exist_ok=True)
+        # Shallow clone: only the tagged tree is needed
         subprocess.run([
-            "git","clone",
+            "git","clone","--depth","1",
             "https://github.com/Azure/azurehpc-health-checks.git",
             "-b", HEALTH_CHECK_VERSION,
             nhc_path
@@ -37,32 +42,85 @@ def upgrade_nhc():
 # =============================
 # Retrieve VM metadata or resource ID
 # =============================
+# The VM resource ID never changes during the process lifetime; cached after the first success.
+# It is also stable across reboots, so a file cache spares the re-run after a reboot the IMDS call.
+# Kept per node in the user's RESULT_DIR (shared home), not in world-writable /tmp.
+IMDS_CACHE_FILE = os.path.join(RESULT_DIR, f".imds_resource_id_{NODE_NAME}")
+IMDS_CACHE_TTL  = 3600  # seconds
+_cached_resource_id = None
+
 def fetch_imds_resource_id() -> str:
+    global _cached_resource_id
+    if _cached_resource_id is not None:
+        return _cached_resource_id
+    try:
+        st = os.stat(IMDS_CACHE_FILE)
+        # Only trust a fresh file that we own and nobody else can write
+        if (st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+                and time.time() - st.st_mtime < IMDS_CACHE_TTL):
+            with open(IMDS_CACHE_FILE, encoding="utf-8") as f:
+                cached = f.read()
+            if cached:
+                _cached_resource_id = cached
+                return _cached_resource_id
+    except OSError:
+        pass
     url = "http://169.254.169.254/metadata/instance/compute/resourceId"
     params = {"api-version": "2021-02-01", "format": "text"}
     resp = requests.get(url, headers={"Metadata": "true"}, params=params, timeout=2)
     resp.raise_for_status()
-    return resp.text  # Full ARM resource ID
+    # Failures raise before this point, so a transient IMDS error is retried on the next call
+    _cached_resource_id = resp.text  # Full ARM resource ID
+    try:
+        tmp_path = f"{IMDS_CACHE_FILE}.{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_cached_resource_id)
+        os.replace(tmp_path, IMDS_CACHE_FILE)
+    except OSError as e:
+        logging.debug(f"IMDS cache write failure: {e}")
+    return _cached_resource_id
 
 
 # =============================
 # Output to CSV
 # =============================
+# Characters that force csv.writer to quote a field
+_CSV_SPECIAL_RE = re.compile(r'[,"\r\n]')
+
+def _csv_needs_quoting(rows):
+    special = _CSV_SPECIAL_RE.search
+    return any(not isinstance(cell, str) or special(cell) for row in rows for cell in row)
+
 def write_csv_summary(rows, csv_path):
     os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        for row in rows:
-            writer.writerow(row)
+    rows = list(rows)
+    with open(csv_path, 'w', newline='', encoding='utf-8', buffering=1 << 16) as csvfile:
+        if _csv_needs_quoting(rows):
+            csv.writer(csvfile).writerows(rows)
+        else:
+            # Plain string cells: join directly, same output as csv.writer (excel dialect, CRLF)
+            csvfile.write(''.join(','.join(row) + '\r\n' for row in rows))
     logging.info(f"CSV output: {csv_path}")
 
 # =============================
 # Output to HTML
 # =============================
+# Fixed cell values that never need HTML escaping
+_HTML_SAFE_CELLS = frozenset({
+    "Success", "Fail", "N/A", "Skip", "Passed", "Failed", "All_Success", "SSH Fail"
+})
+# CSS class of the final-result cell
+_FINAL_TD_CLASS = {"All_Success": ' class="all-success"', "Fail": ' class="fail"'}
+
 def write_html_summary(title, headers, rows, html_path):
     os.makedirs(os.path.dirname(html_path), exist_ok=True)
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(f"""<!DOCTYPE html>
+    _esc = html.escape
+    title = _esc(str(title))
+
+    # Collect the document in a list and write it at once
+    parts = []
+    append = parts.append
+    append(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -79,27 +137,26 @@ def write_html_summary(title, headers, rows, html_path):
   <h1>{title}</h1>
   <table>
     <tr>""")
-        for h in headers:
-            f.write(f"<th>{h}</th>")
-        f.write("</tr>\n")
-
-        for row in rows:
-            final = row[-1]
-            tr_class = ' class="ssh-fail"' if final == "SSH Fail" else ""
-            f.write(f"    <tr{tr_class}>")
-            for i, cell in enumerate(row):
-                td_class = ''
-                if i == len(row) - 1:
-                    if cell == "All_Success":
-                        td_class = ' class="all-success"'
-                    elif cell == "Fail":
-                        td_class = ' class="fail"'
-                f.write(f"<td{td_class}>{cell}</td>")
-            f.write("</tr>\n")
-
-        f.write("""  </table>
+    for h in headers:
+        append(f"<th>{_esc(str(h))}</th>")
+    append("</tr>\n")
+
+    safe = _HTML_SAFE_CELLS
+    for row in rows:
+        *cells, final = row
+        append('    <tr class="ssh-fail">' if final == "SSH Fail" else "    <tr>")
+        for cell in cells:
+            append(f"<td>{cell if cell in safe else _esc(str(cell))}</td>")
+        # Only the final column is highlighted
+        final_cell = final if final in safe else _esc(str(final))
+        append(f"<td{_FINAL_TD_CLASS.get(final, '')}>{final_cell}</td></tr>\n")
+
+    append("""  </table>
 </body>
 </html>""")
+
+    with open(html_path, 'w', encoding='utf-8', buffering=65536) as f:
+        f.write("".join(parts))
     logging.info(f"HTML output: {html_path}")
 
 # =============================
@@ -108,6 +165,36 @@ def write_html_summary(title, headers, rows, html_path):
 def filter_summary_for_report(results, scheduler_node):
     return [r for r in results if r.get("node") != scheduler_node]
 
+# =============================
+# Summary row formatting
+# =============================
+# Labels for initial/final return codes; any other code is "Fail"
+_RC_LABELS = {0: "All_Success", 255: "SSH Fail"}
+_BW_FORMAT = "{:.2f} GB/s".format
+
+def _summary_rows(results):
+    """
+    Yield one report row per result entry, in the column order of summarize_and_output's headers.
+    """
+    rc_label = _RC_LABELS.get
+    for entry in results:
+        get = entry.get
+        init_rc  = get("initial_returncode", 1)
+        nccl_bw  = get("nccl_bw")
+        multi_bw = get("nccl_multi_bw")
+        yield [
+            get("node", ""),
+            # GPU check is initial_returncode==0 -> Success
+            ("Fail", "Success")[init_rc == 0],
+            get("nccl_status", "N/A"),
+            _BW_FORMAT(nccl_bw) if isinstance(nccl_bw, (int, float)) else "N/A",
+            get("multi_status", "N/A"),
+            _BW_FORMAT(multi_bw) if isinstance(multi_bw, (int, float)) else "N/A",
+            rc_label(init_rc, "Fail"),
+            str(get("reboot_count", 0)),
+            rc_label(get("final_returncode", 1), "Fail"),
+        ]
+
 # =============================
 # Process and save test result data
 # =============================
@@ -135,58 +222,8 @@ def summarize_and_output(results, result_dir):
         "Final Result"       # All_Success / SSH Fail / Fail
     ]
 
-    # Format each line (data lines only)
-    rows = []
-    for entry in results:
-        node = entry.get("node", "")
-        ts_entry = entry.get("timestamp", "")
-
-        # GPU check is initial_returncode==0 -> Success
-        gpu_ok = (entry.get("initial_returncode", 1) == 0)
-        gpu_str = "Success" if gpu_ok else "Fail"
-
-        # NCCL Standalone
-        nccl_status = entry.get("nccl_status", "N/A")
-        nccl_bw     = entry.get("nccl_bw")
-        nccl_bw_str = f"{nccl_bw:.2f} GB/s" if isinstance(nccl_bw, (int, float)) else "N/A"
-
-        # NCCL Multi Node
-        multi_status = entry.get("multi_status", "N/A")
-        multi_bw     = entry.get("nccl_multi_bw")
-        multi_bw_str = f"{multi_bw:.2f} GB/s" if isinstance(multi_bw, (int, float)) else "N/A"
-
-        # Process and save test result data
-        init_rc = entry.get("initial_returncode", 1)
-        if init_rc == 0:
-            init_str = "All_Success"
-        elif init_rc == 255:
-            init_str = "SSH Fail"
-        else:
-            init_str = "Fail"
-
-        # Number of Reboot
-        reboot = entry.get("reboot_count", 0)
-
-        # Process and save test result data
-        frc = entry.get("final_returncode", 1)
-        if frc == 0:
-            final_str = "All_Success"
-        elif frc == 255:
-            final_str = "SSH Fail"
-        else:
-            final_str = "Fail"
-
-        rows.append([
-            node,
-            gpu_str,
-            nccl_status,
-            nccl_bw_str,
-            multi_status,
-            multi_bw_str,
-            init_str,
-            str(reboot),
-            final_str
-        ])
+    # Format each line (data lines only); both writers need them, so build the list once
+    rows = list(_summary_rows(results))
 
     csv_path  = os.path.join(result_dir, "hpcai_gpu_check_summary.csv")
     html_path = os.path.join(result_dir, "hpcai_gpu_check_summary.html")
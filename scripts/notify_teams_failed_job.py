@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
-imort sys
+import sys
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
 WEBHOOK_URL = "https://outlook.office.com/webhook/..."  # Replace with your actual URL
 
+# Reuse one connection to the webhook host across notifications
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
 def notify_teams(job_id, user, exit_code, nodes):
     message = {
         "@type": "MessageCard",
@@ -25,7 +30,7 @@ def notify_teams(job_id, user, exit_code, nodes):
         }]
     }
 
-    response = requests.post(WEBHOOK_URL, json=message)
+    response = _session.post(WEBHOOK_URL, json=message, timeout=5)
     if response.status_code == 200:
         print(f"[INFO] Teams notification sent successfully.")
     if response.status_code != 200:
@@ -37,4 +42,4 @@ if __name__ == "__main__":
     user = sys.argv[2]
     exit_code = sys.argv[3]
     nodes = sys.argv[4:]  # passed as list
-    notify_teams(job_id, user, exit_code, nodes)p
+    notify_teams(job_id, user, exit_code, nodes)